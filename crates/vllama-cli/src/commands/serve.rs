@@ -11,15 +11,48 @@ use serde_json::json;
 #[cfg(unix)]
 use std::os::unix::process::CommandExt;
 
-#[allow(clippy::too_many_arguments)]
+const VLLM_LOG: &str = "vllm.log";
+
+/// Engine settings forwarded to the vLLM OpenAI server
+#[derive(Debug, Clone)]
+pub struct VllmOptions {
+    /// Max sequences scheduled per step (--max-num-seqs)
+    pub max_num_seqs: usize,
+    /// Token budget per scheduler step (--max-num-batched-tokens)
+    pub max_num_batched_tokens: usize,
+    pub gpu_memory_utilization: f32,
+    /// KV cache precision; `None` lets vLLM use the model dtype
+    pub kv_cache_dtype: Option<String>,
+    pub enable_chunked_prefill: bool,
+    pub enable_prefix_caching: bool,
+}
+
+impl VllmOptions {
+    /// Human-readable list of enabled scheduler optimizations
+    fn optimizations(&self) -> String {
+        let mut enabled = Vec::new();
+        if self.enable_chunked_prefill {
+            enabled.push("chunked-prefill");
+        }
+        if self.enable_prefix_caching {
+            enabled.push("prefix-caching");
+        }
+
+        if enabled.is_empty() {
+            "none".to_string()
+        } else {
+            enabled.join(", ")
+        }
+    }
+}
+
 pub async fn run(
     host: String,
     port: u16,
     model: Option<String>,
     vllm_port: u16,
     no_vllm: bool,
-    max_num_seqs: usize,
-    gpu_memory_utilization: f32,
+    vllm: VllmOptions,
     output_mode: OutputMode,
 ) -> Result<()> {
     let mut vllm_process: Option<Child> = None;
@@ -38,10 +71,11 @@ pub async fn run(
                     println!("{}", output::section("Loading model"));
                     output::kv("Model", model_name);
                     output::kv("Port", &vllm_port.to_string());
-                    output::kv("Max sequences", &max_num_seqs.to_string());
-                    output::kv("Batched tokens", "16,384");
-                    output::kv("GPU memory", &format!("{:.0}%", gpu_memory_utilization * 100.0));
-                    output::kv("Optimizations", "chunked-prefill, prefix-caching");
+                    output::kv("Max sequences", &vllm.max_num_seqs.to_string());
+                    output::kv("Batched tokens", &vllm.max_num_batched_tokens.to_string());
+                    output::kv("GPU memory", &format!("{:.0}%", vllm.gpu_memory_utilization * 100.0));
+                    output::kv("KV cache dtype", vllm.kv_cache_dtype.as_deref().unwrap_or("auto"));
+                    output::kv("Optimizations", &vllm.optimizations());
                     output::kv("Logs", "vllm.log");
                     println!();
                 }
@@ -50,19 +84,20 @@ pub async fn run(
                         "event": "vllm_starting",
                         "model": model_name,
                         "port": vllm_port,
-                        "max_sequences": max_num_seqs,
-                        "gpu_memory_utilization": gpu_memory_utilization
+                        "max_sequences": vllm.max_num_seqs,
+                        "max_batched_tokens": vllm.max_num_batched_tokens,
+                        "gpu_memory_utilization": vllm.gpu_memory_utilization,
+                        "kv_cache_dtype": vllm.kv_cache_dtype.as_deref().unwrap_or("auto"),
+                        "chunked_prefill": vllm.enable_chunked_prefill,
+                        "prefix_caching": vllm.enable_prefix_caching
                     }));
                 }
                 OutputMode::Quiet => {}
             }
 
-            vllm_process = Some(start_vllm_server(
-                model_name,
-                vllm_port,
-                max_num_seqs,
-                gpu_memory_utilization,
-            )?);
+            let log_offset = vllm_log_offset();
+
+            vllm_process = Some(start_vllm_server(model_name, vllm_port, &vllm)?);
 
             // Wait for vLLM with spinner
             let spinner = if output_mode == OutputMode::Normal {
@@ -92,8 +127,55 @@ pub async fn run(
                 sp.finish_with_message(output::success("vLLM engine ready"));
             }
 
-            if output_mode == OutputMode::Json {
-                output::json(&json!({"event": "vllm_ready"}));
+            // Run one tiny request so the first user request doesn't pay for
+            // lazy initialization (tokenizer, detokenizer, first scheduler step)
+            let spinner = if output_mode == OutputMode::Normal {
+                Some(output::spinner("Warming up..."))
+            } else {
+                None
+            };
+
+            let warm = warmup_vllm(vllm_port, model_name).await;
+            if !warm {
+                warn!("vLLM warmup request failed; first request may be slower");
+            }
+
+            if let Some(sp) = spinner {
+                if warm {
+                    sp.finish_and_clear();
+                } else {
+                    sp.finish_with_message(output::warning("Warmup request failed (see vllm.log)"));
+                }
+            }
+
+            let log = read_vllm_log(log_offset);
+            let kv_cache = match_log_lines(&log, &KV_CACHE_MARKERS);
+            let scheduler = match_log_lines(&log, &SCHEDULER_MARKERS);
+            for line in kv_cache.iter().chain(&scheduler) {
+                info!("vLLM {}", line);
+            }
+
+            if vllm.enable_chunked_prefill && !scheduler.iter().any(|l| l.contains("Chunked prefill")) {
+                warn!("Could not confirm chunked prefill is enabled (check vllm.log)");
+            }
+            if vllm.enable_prefix_caching && !engine_config_has(&log, "enable_prefix_caching=True") {
+                warn!("Could not confirm prefix caching is enabled (check vllm.log)");
+            }
+
+            match output_mode {
+                OutputMode::Normal => {
+                    for line in &kv_cache {
+                        println!("{}", output::bullet(line));
+                    }
+                }
+                OutputMode::Json => {
+                    output::json(&json!({
+                        "event": "vllm_ready",
+                        "kv_cache": kv_cache,
+                        "scheduler": scheduler
+                    }));
+                }
+                OutputMode::Quiet => {}
             }
 
             if output_mode == OutputMode::Normal {
@@ -146,6 +228,7 @@ pub async fn run(
             println!();
             println!("  Ollama API:");
             println!("{}", output::bullet("POST /api/generate"));
+            println!("{}", output::bullet("POST /api/generate_batch"));
             println!("{}", output::bullet("POST /api/chat"));
             println!("{}", output::bullet("GET  /api/ps"));
             println!();
@@ -154,6 +237,10 @@ pub async fn run(
             println!("{}", output::bullet("POST /v1/completions"));
             println!("{}", output::bullet("POST /v1/chat/completions"));
             println!();
+            println!("  Monitoring:");
+            println!("{}", output::bullet("GET  /health"));
+            println!("{}", output::bullet("GET  /metrics"));
+            println!();
             println!("Press Ctrl+C to stop");
             println!();
         }
@@ -167,9 +254,11 @@ pub async fn run(
                 "port": port,
                 "endpoints": [
                     "/api/generate",
+                    "/api/generate_batch",
                     "/api/chat",
                     "/v1/chat/completions",
-                    "/api/ps"
+                    "/api/ps",
+                    "/metrics"
                 ]
             }));
         }
@@ -256,90 +345,134 @@ fn kill_process_tree(child: &mut Child) -> std::io::Result<()> {
     child.kill()
 }
 
-fn start_vllm_server(
-    model: &str,
-    port: u16,
-    max_num_seqs: usize,
-    gpu_memory_utilization: f32,
-) -> Result<Child> {
+fn start_vllm_server(model: &str, port: u16, options: &VllmOptions) -> Result<Child> {
     // Redirect vLLM output to log file for clean CLI UX
     use std::fs::OpenOptions;
 
     let log_file = OpenOptions::new()
         .create(true)
         .append(true)
-        .open("vllm.log")
+        .open(VLLM_LOG)
         .context("Failed to create vllm.log file")?;
 
+    let mut args: Vec<String> = [
+        "run",
+        "--directory",
+        "python",
+        "python",
+        "-m",
+        "vllm.entrypoints.openai.api_server",
+        "--model",
+        model,
+        "--port",
+        &port.to_string(),
+        // Concurrency & Batching
+        "--max-num-seqs",
+        &options.max_num_seqs.to_string(),
+        "--max-num-batched-tokens",
+        &options.max_num_batched_tokens.to_string(),
+        // Performance optimizations
+        if options.enable_chunked_prefill {
+            "--enable-chunked-prefill" // Better concurrent request handling
+        } else {
+            "--no-enable-chunked-prefill"
+        },
+        if options.enable_prefix_caching {
+            "--enable-prefix-caching" // Reuse KV cache for repeated prompts
+        } else {
+            "--no-enable-prefix-caching"
+        },
+        // Memory
+        "--gpu-memory-utilization",
+        &options.gpu_memory_utilization.to_string(),
+        // vllama already logs every request; skip uvicorn's per-request access log
+        "--disable-uvicorn-access-log",
+    ]
+    .iter()
+    .map(|s| s.to_string())
+    .collect();
+
+    // KV cache precision (vLLM picks the model dtype when unset)
+    if let Some(dtype) = &options.kv_cache_dtype {
+        args.push("--kv-cache-dtype".to_string());
+        args.push(dtype.to_string());
+    }
+
+    let mut command = Command::new("uv");
+    command
+        .args(&args)
+        .stdout(Stdio::from(log_file.try_clone()?))
+        .stderr(Stdio::from(log_file));
+
+    // Create new process group so we can kill the entire tree
     #[cfg(unix)]
-    let child = {
-        Command::new("uv")
-            .args([
-                "run",
-                "--directory",
-                "python",
-                "python",
-                "-m",
-                "vllm.entrypoints.openai.api_server",
-                "--model",
-                model,
-                "--port",
-                &port.to_string(),
-                // Concurrency & Batching
-                "--max-num-seqs",
-                &max_num_seqs.to_string(),
-                "--max-num-batched-tokens",
-                "16384", // 32x increase from default (512) for better throughput
-                // Performance optimizations
-                "--enable-chunked-prefill", // Better concurrent request handling
-                "--enable-prefix-caching",  // Reuse KV cache for repeated prompts
-                // Memory
-                "--gpu-memory-utilization",
-                &gpu_memory_utilization.to_string(),
-            ])
-            .stdout(Stdio::from(log_file.try_clone()?))
-            .stderr(Stdio::from(log_file))
-            // Create new process group so we can kill the entire tree
-            .process_group(0)
-            .spawn()
-            .context("Failed to start vLLM server. Is uv installed? (curl -LsSf https://astral.sh/uv/install.sh | sh)")?
-    };
+    command.process_group(0);
 
-    #[cfg(not(unix))]
-    let child = {
-        Command::new("uv")
-            .args([
-                "run",
-                "--directory",
-                "python",
-                "python",
-                "-m",
-                "vllm.entrypoints.openai.api_server",
-                "--model",
-                model,
-                "--port",
-                &port.to_string(),
-                // Concurrency & Batching
-                "--max-num-seqs",
-                &max_num_seqs.to_string(),
-                "--max-num-batched-tokens",
-                "16384",
-                // Performance optimizations
-                "--enable-chunked-prefill",
-                "--enable-prefix-caching",
-                // Memory
-                "--gpu-memory-utilization",
-                &gpu_memory_utilization.to_string(),
-            ])
-            .stdout(Stdio::from(log_file.try_clone()?))
-            .stderr(Stdio::from(log_file))
-            .spawn()
-            .context("Failed to start vLLM server. Is uv installed? (curl -LsSf https://astral.sh/uv/install.sh | sh)")?
-    };
+    let child = command
+        .spawn()
+        .context("Failed to start vLLM server. Is uv installed? (curl -LsSf https://astral.sh/uv/install.sh | sh)")?;
 
     Ok(child)
 }
 
+/// Current size of vllm.log, used to skip output from previous runs
+fn vllm_log_offset() -> u64 {
+    std::fs::metadata(VLLM_LOG).map(|m| m.len()).unwrap_or(0)
+}
+
+/// vLLM log lines reporting how much KV cache was allocated after profiling
+/// (`GPU KV cache size` / `Maximum concurrency` on V1, `# GPU blocks` on V0)
+const KV_CACHE_MARKERS: [&str; 3] = ["GPU KV cache size", "Maximum concurrency", "# GPU blocks"];
+
+/// vLLM log lines confirming the scheduler settings actually in effect
+const SCHEDULER_MARKERS: [&str; 2] = ["Chunked prefill is enabled", "non-default args"];
+
+/// Marker of the `Initializing a V1 LLM engine (...) with config: ...` line,
+/// which lists every engine setting as `key=value`
+const ENGINE_CONFIG_MARKER: &str = "with config:";
+
+/// Whether vLLM's engine config line reports `setting` (e.g.
+/// `enable_prefix_caching=True`)
+fn engine_config_has(contents: &str, setting: &str) -> bool {
+    contents
+        .lines()
+        .filter(|line| line.contains(ENGINE_CONFIG_MARKER))
+        .any(|line| line.split([' ', ',']).any(|field| field == setting))
+}
+
+/// Read vllm.log output written since `offset`
+fn read_vllm_log(offset: u64) -> String {
+    use std::io::{Read, Seek, SeekFrom};
+
+    let mut contents = Vec::new();
+    let read = std::fs::File::open(VLLM_LOG).and_then(|mut file| {
+        file.seek(SeekFrom::Start(offset))?;
+        file.read_to_end(&mut contents)
+    });
+
+    match read {
+        Ok(_) => String::from_utf8_lossy(&contents).into_owned(),
+        Err(_) => String::new(),
+    }
+}
+
+/// Extract the interesting part of each log line containing one of `markers`
+///
+/// Surfacing these makes it easy to tune --gpu-memory-utilization and
+/// --max-num-seqs, and to confirm chunked prefill / prefix caching are on,
+/// without digging through the log.
+fn match_log_lines(contents: &str, markers: &[&str]) -> Vec<String> {
+    contents
+        .lines()
+        .filter_map(|line| {
+            markers
+                .iter()
+                .find_map(|marker| line.find(marker))
+                .map(|idx| line[idx..].trim().to_string())
+        })
+        .collect()
+}
+
 async fn wait_for_vllm_ready(port: u16) -> bool {
     let client = reqwest::Client::new();
     let url = format!("http://127.0.0.1:{}/health", port);
@@ -361,6 +494,25 @@ async fn wait_for_vllm_ready(port: u16) -> bool {
     false
 }
 
+/// Send a single one-token completion through vLLM
+async fn warmup_vllm(port: u16, model: &str) -> bool {
+    let client = reqwest::Client::new();
+    let url = format!("http://127.0.0.1:{}/v1/completions", port);
+
+    let response = client
+        .post(&url)
+        .json(&json!({
+            "model": model,
+            "prompt": "Hello",
+            "max_tokens": 1
+        }))
+        .timeout(Duration::from_secs(60))
+        .send()
+        .await;
+
+    matches!(response, Ok(r) if r.status().is_success())
+}
+
 async fn shutdown_signal() {
     let ctrl_c = async {
         signal::ctrl_c()
@@ -384,3 +536,41 @@ async fn shutdown_signal() {
         _ = terminate => {},
     }
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_match_log_lines() {
+        let log = "\
+INFO 10-14 12:00:01 [gpu_worker.py:298] Available KV cache memory: 18.2 GiB
+INFO 10-14 12:00:01 [kv_cache_utils.py:1087] GPU KV cache size: 341,280 tokens
+INFO 10-14 12:00:01 [kv_cache_utils.py:1091] Maximum concurrency for 4,096 tokens per request: 83.32x
+INFO 10-14 12:00:00 [scheduler.py:222] Chunked prefill is enabled with max_num_batched_tokens=16384.
+INFO 10-14 12:00:00 [core.py:77] Initializing a V1 LLM engine (v0.11.0) with config: model='facebook/opt-125m', seed=0, enable_prefix_caching=True, chunked_prefill_enabled=True, use_async_output_proc=True
+";
+
+        let kv_cache = match_log_lines(log, &KV_CACHE_MARKERS);
+        assert_eq!(
+            kv_cache,
+            vec![
+                "GPU KV cache size: 341,280 tokens",
+                "Maximum concurrency for 4,096 tokens per request: 83.32x",
+            ]
+        );
+
+        let scheduler = match_log_lines(log, &SCHEDULER_MARKERS);
+        assert_eq!(
+            scheduler,
+            vec!["Chunked prefill is enabled with max_num_batched_tokens=16384."]
+        );
+
+        assert!(engine_config_has(log, "enable_prefix_caching=True"));
+        assert!(!engine_config_has(log, "enable_prefix_caching=False"));
+        assert!(!engine_config_has(
+            "INFO [core.py:77] Initializing a V1 LLM engine (v0.11.0) with config: enable_prefix_caching=False, seed=0",
+            "enable_prefix_caching=True"
+        ));
+    }
+}
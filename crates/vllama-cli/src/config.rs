@@ -7,11 +7,14 @@
 //! 3. ~/.config/vllama/config.toml (user global)
 //! 4. Built-in defaults
 
-use anyhow::{Context, Result};
+use anyhow::{bail, Context, Result};
 use serde::{Deserialize, Serialize};
 use std::path::PathBuf;
 use tracing::debug;
 
+/// KV cache dtypes accepted for `--kv-cache-dtype` and `[model] kv_cache_dtype`
+pub const KV_CACHE_DTYPES: [&str; 4] = ["auto", "fp8", "fp8_e4m3", "fp8_e5m2"];
+
 #[derive(Debug, Clone, Serialize, Deserialize, Default)]
 pub struct Config {
     #[serde(default)]
@@ -48,6 +51,18 @@ pub struct ModelConfig {
 
     #[serde(default = "default_max_num_seqs")]
     pub max_num_seqs: usize,
+
+    #[serde(default = "default_max_num_batched_tokens")]
+    pub max_num_batched_tokens: usize,
+
+    /// KV cache dtype passed to vLLM (`auto`, `fp8`, `fp8_e4m3`, `fp8_e5m2`)
+    pub kv_cache_dtype: Option<String>,
+
+    #[serde(default = "default_true")]
+    pub enable_chunked_prefill: bool,
+
+    #[serde(default = "default_true")]
+    pub enable_prefix_caching: bool,
 }
 
 #[derive(Debug, Clone, Serialize, Deserialize)]
@@ -78,12 +93,32 @@ impl Default for ServerConfig {
     }
 }
 
+impl ModelConfig {
+    /// Reject values vLLM would only refuse after it has started
+    fn validate(&self) -> Result<()> {
+        if let Some(dtype) = &self.kv_cache_dtype {
+            if !KV_CACHE_DTYPES.contains(&dtype.as_str()) {
+                bail!(
+                    "invalid kv_cache_dtype {:?} (expected one of: {})",
+                    dtype,
+                    KV_CACHE_DTYPES.join(", ")
+                );
+            }
+        }
+        Ok(())
+    }
+}
+
 impl Default for ModelConfig {
     fn default() -> Self {
         Self {
             default_model: None,
             gpu_memory_utilization: default_gpu_memory_utilization(),
             max_num_seqs: default_max_num_seqs(),
+            max_num_batched_tokens: default_max_num_batched_tokens(),
+            kv_cache_dtype: None,
+            enable_chunked_prefill: true,
+            enable_prefix_caching: true,
         }
     }
 }
@@ -111,11 +146,19 @@ fn default_vllm_port() -> u16 {
 }
 
 fn default_gpu_memory_utilization() -> f32 {
-    0.9
+    0.95
 }
 
 fn default_max_num_seqs() -> usize {
-    256
+    64  // Enough for 1-50 concurrent users without over-reserving KV cache
+}
+
+fn default_max_num_batched_tokens() -> usize {
+    16384
+}
+
+fn default_true() -> bool {
+    true
 }
 
 fn default_log_level() -> String {
@@ -157,8 +200,14 @@ impl Config {
         let content = std::fs::read_to_string(path)
             .with_context(|| format!("Failed to read config file: {:?}", path))?;
 
-        toml::from_str(&content)
-            .with_context(|| format!("Failed to parse config file: {:?}", path))
+        let config: Self = toml::from_str(&content)
+            .with_context(|| format!("Failed to parse config file: {:?}", path))?;
+
+        if let Err(e) = config.model.validate() {
+            bail!("Invalid config file {:?}: {}", path, e);
+        }
+
+        Ok(config)
     }
 
     /// Get user config file path (~/.config/vllama/config.toml)
@@ -197,6 +246,18 @@ impl Config {
         if other.model.max_num_seqs != default_max_num_seqs() {
             self.model.max_num_seqs = other.model.max_num_seqs;
         }
+        if other.model.max_num_batched_tokens != default_max_num_batched_tokens() {
+            self.model.max_num_batched_tokens = other.model.max_num_batched_tokens;
+        }
+        if other.model.kv_cache_dtype.is_some() {
+            self.model.kv_cache_dtype = other.model.kv_cache_dtype;
+        }
+        if !other.model.enable_chunked_prefill {
+            self.model.enable_chunked_prefill = false;
+        }
+        if !other.model.enable_prefix_caching {
+            self.model.enable_prefix_caching = false;
+        }
 
         // Logging settings
         if other.logging.level != default_log_level() {
@@ -233,7 +294,12 @@ mod tests {
         let config = Config::default();
         assert_eq!(config.server.host, "127.0.0.1");
         assert_eq!(config.server.port, 11435);
-        assert_eq!(config.model.gpu_memory_utilization, 0.9);
+        assert_eq!(config.model.gpu_memory_utilization, 0.95);
+        assert_eq!(config.model.max_num_seqs, 64);
+        assert_eq!(config.model.max_num_batched_tokens, 16384);
+        assert!(config.model.kv_cache_dtype.is_none());
+        assert!(config.model.enable_chunked_prefill);
+        assert!(config.model.enable_prefix_caching);
     }
 
     #[test]
@@ -247,6 +313,20 @@ mod tests {
         assert_eq!(merged.server.host, "127.0.0.1"); // unchanged
     }
 
+    #[test]
+    fn test_kv_cache_dtype_validation() {
+        let mut model = ModelConfig::default();
+        assert!(model.validate().is_ok());
+
+        for dtype in KV_CACHE_DTYPES {
+            model.kv_cache_dtype = Some(dtype.to_string());
+            assert!(model.validate().is_ok());
+        }
+
+        model.kv_cache_dtype = Some("fp16".to_string());
+        assert!(model.validate().is_err());
+    }
+
     #[test]
     fn test_example_config() {
         let example = Config::example();
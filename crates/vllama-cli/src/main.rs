@@ -39,7 +39,7 @@ enum Commands {
         #[arg(short, long, default_value = "11435", help = "Server port (11435 works alongside Ollama on 11434)")]
         port: u16,
 
-        #[arg(long, help = "Model to load in vLLM (e.g., meta-llama/Llama-3.2-1B-Instruct)")]
+        #[arg(long, env = "VLLAMA_MODEL", help = "Model to load in vLLM (e.g., meta-llama/Llama-3.2-1B-Instruct)")]
         model: Option<String>,
 
         #[arg(long, default_value = "8100", help = "vLLM OpenAI server port")]
@@ -48,11 +48,27 @@ enum Commands {
         #[arg(long, help = "Skip auto-starting vLLM server (use existing instance)")]
         no_vllm: bool,
 
-        #[arg(long, default_value = "256", help = "vLLM max concurrent sequences")]
+        #[arg(long, default_value = "64", help = "vLLM max concurrent sequences")]
         max_num_seqs: usize,
 
-        #[arg(long, default_value = "0.9", help = "vLLM GPU memory utilization (0.0-1.0)")]
+        #[arg(long, default_value = "16384", help = "vLLM max tokens batched per scheduler step")]
+        max_num_batched_tokens: usize,
+
+        #[arg(long, default_value = "0.95", help = "vLLM GPU memory utilization (0.0-1.0)")]
         gpu_memory_utilization: f32,
+
+        #[arg(
+            long,
+            value_parser = config::KV_CACHE_DTYPES,
+            help = "vLLM KV cache dtype (default: auto, same as model dtype; fp8 halves KV cache memory)"
+        )]
+        kv_cache_dtype: Option<String>,
+
+        #[arg(long, help = "Disable vLLM chunked prefill")]
+        no_chunked_prefill: bool,
+
+        #[arg(long, help = "Disable vLLM automatic prefix caching")]
+        no_prefix_caching: bool,
     },
 
     #[command(about = "Run a model and chat interactively")]
@@ -174,31 +190,40 @@ async fn run_command(command: Commands, output_mode: OutputMode, config: config:
             vllm_port,
             no_vllm,
             max_num_seqs,
+            max_num_batched_tokens,
             gpu_memory_utilization,
+            kv_cache_dtype,
+            no_chunked_prefill,
+            no_prefix_caching,
         } => {
             // Apply config defaults when CLI flags not provided
             let host = if host == "127.0.0.1" { config.server.host } else { host };
             let port = if port == 11435 { config.server.port } else { port };
             let vllm_port = if vllm_port == 8100 { config.server.vllm_port } else { vllm_port };
             let model = model.or(config.model.default_model);
-            let max_num_seqs = if max_num_seqs == 256 { config.model.max_num_seqs } else { max_num_seqs };
-            let gpu_memory_utilization = if (gpu_memory_utilization - 0.9).abs() < 0.001 {
+            let kv_cache_dtype = kv_cache_dtype.or(config.model.kv_cache_dtype);
+            let max_num_seqs = if max_num_seqs == 64 { config.model.max_num_seqs } else { max_num_seqs };
+            let max_num_batched_tokens = if max_num_batched_tokens == 16384 {
+                config.model.max_num_batched_tokens
+            } else {
+                max_num_batched_tokens
+            };
+            let gpu_memory_utilization = if (gpu_memory_utilization - 0.95).abs() < 0.001 {
                 config.model.gpu_memory_utilization
             } else {
                 gpu_memory_utilization
             };
 
-            serve::run(
-                host,
-                port,
-                model,
-                vllm_port,
-                no_vllm,
+            let vllm = serve::VllmOptions {
                 max_num_seqs,
+                max_num_batched_tokens,
                 gpu_memory_utilization,
-                output_mode,
-            )
-            .await?;
+                kv_cache_dtype,
+                enable_chunked_prefill: !no_chunked_prefill && config.model.enable_chunked_prefill,
+                enable_prefix_caching: !no_prefix_caching && config.model.enable_prefix_caching,
+            };
+
+            serve::run(host, port, model, vllm_port, no_vllm, vllm, output_mode).await?;
         }
         Commands::Run { model, prompt } => {
             run::execute(model, prompt).await?;
@@ -11,7 +11,7 @@ pub use downloader::{CachedModel, DownloadProgress, ModelDownloader};
 pub use error::{Error, Result};
 pub use hardware::{Hardware, HardwareType, GpuInfo};
 pub use model::{ModelHandle, ModelInfo, ModelFormat};
-pub use openai::{OpenAIClient, CompletionRequest, CompletionResponse, ChatCompletionRequest, ChatCompletionResponse};
+pub use openai::{OpenAIClient, CompletionRequest, CompletionResponse, ChatCompletionRequest, ChatCompletionResponse, StreamOptions};
 pub use request::{ChatMessage, ChatRequest, ChatRole, GenerateRequest, GenerateOptions, SamplingParams};
 pub use response::{GenerateResponse, TokenInfo, GenerationStats};
 pub use types::{RequestId, Token, TokenId};
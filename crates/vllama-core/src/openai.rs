@@ -95,45 +95,7 @@ impl OpenAIClient {
             )));
         }
 
-        Ok(Self::parse_sse_stream(response))
-    }
-
-    /// Parse SSE stream into completion chunks
-    fn parse_sse_stream(
-        response: reqwest::Response,
-    ) -> impl futures::Stream<Item = Result<CompletionChunk>> {
-        use futures::stream::StreamExt;
-
-        response
-            .bytes_stream()
-            .map(|result| {
-                result.map_err(|e| Error::ModelLoadFailed(format!("Stream error: {}", e)))
-            })
-            .filter_map(|result| async move {
-                match result {
-                    Ok(bytes) => {
-                        let text = String::from_utf8_lossy(&bytes);
-                        for line in text.lines() {
-                            if let Some(data) = line.strip_prefix("data: ") {
-                                if data == "[DONE]" {
-                                    return None;
-                                }
-                                match serde_json::from_str::<CompletionChunk>(data) {
-                                    Ok(chunk) => return Some(Ok(chunk)),
-                                    Err(e) => {
-                                        return Some(Err(Error::ModelLoadFailed(format!(
-                                            "Failed to parse chunk: {}",
-                                            e
-                                        ))))
-                                    }
-                                }
-                            }
-                        }
-                        None
-                    }
-                    Err(e) => Some(Err(e)),
-                }
-            })
+        Ok(parse_sse_stream(response.bytes_stream()))
     }
 
     /// Health check
@@ -147,6 +109,60 @@ impl OpenAIClient {
     }
 }
 
+/// Parse an SSE byte stream into completion chunks
+///
+/// Network reads don't line up with SSE events: one read can carry several
+/// tokens and an event can be split across reads. Bytes are buffered and
+/// every complete `data:` line is yielded as soon as it arrives, so tokens
+/// are neither delayed nor dropped.
+fn parse_sse_stream<S, B, E>(bytes: S) -> impl futures::Stream<Item = Result<CompletionChunk>>
+where
+    S: futures::Stream<Item = std::result::Result<B, E>>,
+    B: AsRef<[u8]>,
+    E: std::fmt::Display,
+{
+    use futures::stream::StreamExt;
+
+    async_stream::stream! {
+        let mut bytes = std::pin::pin!(bytes);
+        let mut buffer: Vec<u8> = Vec::new();
+
+        while let Some(result) = bytes.next().await {
+            match result {
+                Ok(data) => buffer.extend_from_slice(data.as_ref()),
+                Err(e) => {
+                    yield Err(Error::ModelLoadFailed(format!("Stream error: {}", e)));
+                    return;
+                }
+            }
+
+            let mut consumed = 0;
+            while let Some(len) = buffer[consumed..].iter().position(|&b| b == b'\n') {
+                let line = String::from_utf8_lossy(&buffer[consumed..consumed + len]).into_owned();
+                consumed += len + 1;
+
+                let Some(data) = sse_data(&line) else {
+                    continue;
+                };
+                if data == "[DONE]" {
+                    return;
+                }
+
+                yield serde_json::from_str::<CompletionChunk>(data).map_err(|e| {
+                    Error::ModelLoadFailed(format!("Failed to parse chunk: {}", e))
+                });
+            }
+            buffer.drain(..consumed);
+        }
+    }
+}
+
+/// Payload of an SSE `data:` line, or `None` for other lines
+fn sse_data(line: &str) -> Option<&str> {
+    let value = line.trim_end_matches('\r').strip_prefix("data:")?;
+    Some(value.strip_prefix(' ').unwrap_or(value))
+}
+
 // ============================================================================
 // OpenAI API Types
 // ============================================================================
@@ -165,6 +181,14 @@ pub struct CompletionRequest {
     pub stream: Option<bool>,
     #[serde(skip_serializing_if = "Option::is_none")]
     pub stop: Option<Vec<String>>,
+    #[serde(skip_serializing_if = "Option::is_none")]
+    pub stream_options: Option<StreamOptions>,
+}
+
+#[derive(Debug, Clone, Serialize, Deserialize)]
+pub struct StreamOptions {
+    /// Ask for a final chunk carrying token usage (with empty `choices`)
+    pub include_usage: bool,
 }
 
 #[derive(Debug, Clone, Serialize, Deserialize)]
@@ -191,6 +215,9 @@ pub struct CompletionChunk {
     pub created: u64,
     pub model: String,
     pub choices: Vec<CompletionChoiceChunk>,
+    /// Only set on the final chunk, when `stream_options.include_usage` is on
+    #[serde(default, skip_serializing_if = "Option::is_none")]
+    pub usage: Option<Usage>,
 }
 
 #[derive(Debug, Clone, Serialize, Deserialize)]
@@ -264,10 +291,64 @@ mod tests {
             top_p: Some(0.9),
             stream: Some(false),
             stop: None,
+            stream_options: None,
         };
 
         let json = serde_json::to_string(&request).unwrap();
         assert!(json.contains("test-model"));
         assert!(json.contains("Hello"));
     }
+
+    #[test]
+    fn test_sse_data() {
+        assert_eq!(sse_data("data: {\"id\":1}"), Some("{\"id\":1}"));
+        assert_eq!(sse_data("data:[DONE]\r"), Some("[DONE]"));
+        assert_eq!(sse_data(": keep-alive"), None);
+        assert_eq!(sse_data(""), None);
+    }
+
+    fn chunk_event(text: &str) -> String {
+        format!(
+            "data: {{\"id\":\"cmpl-1\",\"object\":\"text_completion\",\"created\":0,\"model\":\"test-model\",\"choices\":[{{\"text\":\"{}\",\"index\":0,\"finish_reason\":null}}]}}\n\n",
+            text
+        )
+    }
+
+    async fn parse_texts(reads: Vec<String>) -> Vec<String> {
+        use futures::StreamExt;
+
+        let reads = futures::stream::iter(reads.into_iter().map(Ok::<_, std::io::Error>));
+        parse_sse_stream(reads)
+            .map(|chunk| chunk.unwrap().choices.into_iter().next().unwrap().text)
+            .collect()
+            .await
+    }
+
+    #[tokio::test]
+    async fn test_parse_sse_stream_two_events_in_one_read() {
+        let read = chunk_event("Hello") + &chunk_event(" world");
+        assert_eq!(parse_texts(vec![read]).await, vec!["Hello", " world"]);
+    }
+
+    #[tokio::test]
+    async fn test_parse_sse_stream_event_split_across_reads() {
+        let event = chunk_event("Hello");
+        let (head, tail) = event.split_at(event.len() / 2);
+        assert_eq!(
+            parse_texts(vec![head.to_string(), tail.to_string()]).await,
+            vec!["Hello"]
+        );
+    }
+
+    #[tokio::test]
+    async fn test_parse_sse_stream_crlf_line_endings() {
+        let read = chunk_event("Hello").replace('\n', "\r\n");
+        assert_eq!(parse_texts(vec![read]).await, vec!["Hello"]);
+    }
+
+    #[tokio::test]
+    async fn test_parse_sse_stream_stops_at_done() {
+        let read = chunk_event("Hello") + "data: [DONE]\n\n" + &chunk_event("ignored");
+        assert_eq!(parse_texts(vec![read]).await, vec!["Hello"]);
+    }
 }
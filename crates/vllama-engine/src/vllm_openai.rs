@@ -9,11 +9,36 @@ use std::path::Path;
 use tracing::info;
 use vllama_core::{
     CompletionRequest, GenerateRequest, GenerateResponse, GenerationStats,
-    Hardware, ModelHandle, OpenAIClient, Result,
+    Hardware, ModelHandle, OpenAIClient, Result, StreamOptions,
 };
 
 use crate::engine::{EngineCapabilities, EngineType, InferenceEngine};
 
+/// Upper bound on stream chunks merged into a single response
+const MAX_COALESCED_CHUNKS: usize = 64;
+
+/// Merge consecutive successful chunks, keeping errors in place
+fn coalesce_chunks(batch: Vec<Result<GenerateResponse>>) -> Vec<Result<GenerateResponse>> {
+    let mut merged: Vec<Result<GenerateResponse>> = Vec::with_capacity(1);
+
+    for result in batch {
+        match (merged.last_mut(), result) {
+            (Some(Ok(prev)), Ok(next)) => {
+                prev.text.push_str(&next.text);
+                prev.stats.prompt_tokens += next.stats.prompt_tokens;
+                prev.stats.generated_tokens += next.stats.generated_tokens;
+                prev.stats.total_tokens += next.stats.total_tokens;
+                prev.finished |= next.finished;
+                // The usage chunk after the finish chunk has no finish reason
+                prev.finish_reason = next.finish_reason.or(prev.finish_reason.take());
+            }
+            (_, result) => merged.push(result),
+        }
+    }
+
+    merged
+}
+
 pub struct VllmOpenAIEngine {
     client: OpenAIClient,
     #[allow(dead_code)]
@@ -39,7 +64,7 @@ impl VllmOpenAIEngine {
         use vllama_core::openai::ChatCompletionRequest;
 
         let openai_messages: Vec<OpenAIChatMessage> = messages
-            .iter()
+            .into_iter()
             .map(|msg| {
                 use vllama_core::ChatRole;
                 let role = match msg.role {
@@ -50,13 +75,13 @@ impl VllmOpenAIEngine {
                 };
                 OpenAIChatMessage {
                     role: role.to_string(),
-                    content: msg.content.clone(),
+                    content: msg.content,
                 }
             })
             .collect();
 
         let request = ChatCompletionRequest {
-            model: model.clone(),
+            model,
             messages: openai_messages,
             max_tokens: options.sampling.max_tokens,
             temperature: Some(options.sampling.temperature),
@@ -110,31 +135,33 @@ impl InferenceEngine for VllmOpenAIEngine {
     async fn generate(&self, request: GenerateRequest) -> Result<GenerateResponse> {
         info!("Generating via vLLM OpenAI API: {}", request.model);
 
-        // Convert to OpenAI completion request
+        // Convert to OpenAI completion request (the prompt is moved, not copied)
         let completion_request = CompletionRequest {
             model: request.model.clone(),
-            prompt: request.prompt.clone(),
+            prompt: request.prompt,
             max_tokens: request.options.sampling.max_tokens,
             temperature: Some(request.options.sampling.temperature),
             top_p: Some(request.options.sampling.top_p),
             stream: Some(false),
             stop: None,
+            stream_options: None,
         };
 
         let response = self.client.create_completion(completion_request).await?;
 
-        // Convert OpenAI response to our format
-        let text = response
-            .choices
-            .first()
-            .map(|c| c.text.clone())
-            .unwrap_or_default();
-
         let stats = GenerationStats::new(
             response.usage.prompt_tokens,
             response.usage.completion_tokens,
         );
 
+        // Convert OpenAI response to our format
+        let (text, finish_reason) = response
+            .choices
+            .into_iter()
+            .next()
+            .map(|c| (c.text, c.finish_reason))
+            .unwrap_or_default();
+
         Ok(GenerateResponse {
             id: request.id,
             model: request.model,
@@ -142,10 +169,7 @@ impl InferenceEngine for VllmOpenAIEngine {
             tokens: Vec::new(),
             stats,
             finished: true,
-            finish_reason: response
-                .choices
-                .first()
-                .and_then(|c| c.finish_reason.clone()),
+            finish_reason,
         })
     }
 
@@ -160,13 +184,16 @@ impl InferenceEngine for VllmOpenAIEngine {
 
         // Convert to OpenAI completion request with streaming
         let completion_request = CompletionRequest {
-            model: request.model.clone(),
-            prompt: request.prompt.clone(),
+            model: request.model,
+            prompt: request.prompt,
             max_tokens: request.options.sampling.max_tokens,
             temperature: Some(request.options.sampling.temperature),
             top_p: Some(request.options.sampling.top_p),
             stream: Some(true),
             stop: None,
+            // Token counts come from vLLM's final usage chunk; chunks don't
+            // map one-to-one to tokens
+            stream_options: Some(StreamOptions { include_usage: true }),
         };
 
         let stream = self
@@ -174,32 +201,56 @@ impl InferenceEngine for VllmOpenAIEngine {
             .create_completion_stream(completion_request)
             .await?;
 
+        // End the stream at the usage chunk, which vLLM sends last, instead of
+        // waiting for the trailing [DONE] event and connection close
+        let stream = stream.scan(false, |done, result| {
+            if *done {
+                return futures::future::ready(None);
+            }
+            if let Ok(chunk) = &result {
+                *done = chunk.usage.is_some();
+            }
+            futures::future::ready(Some(result))
+        });
+
         // Convert chunks to GenerateResponse
         let response_stream = stream.map(move |result| {
             result.map(|chunk| {
-                let text = chunk
+                // Each chunk carries only the new text; take it instead of copying
+                // (the usage chunk has no choices)
+                let (text, finish_reason) = chunk
                     .choices
-                    .first()
-                    .map(|c| c.text.clone())
+                    .into_iter()
+                    .next()
+                    .map(|c| (c.text, c.finish_reason))
                     .unwrap_or_default();
 
-                let finish_reason = chunk
-                    .choices
-                    .first()
-                    .and_then(|c| c.finish_reason.clone());
+                // Text chunks count no tokens; the usage chunk carries the totals
+                let stats = chunk
+                    .usage
+                    .as_ref()
+                    .map(|u| GenerationStats::new(u.prompt_tokens, u.completion_tokens))
+                    .unwrap_or_else(|| GenerationStats::new(0, 0));
 
                 GenerateResponse {
                     id: request_id,
                     model: model.clone(),
                     text,
                     tokens: Vec::new(),
-                    stats: GenerationStats::new(0, 0),
-                    finished: finish_reason.is_some(),
+                    stats,
+                    finished: finish_reason.is_some() || chunk.usage.is_some(),
                     finish_reason,
                 }
             })
         });
 
+        // Under load several chunks are usually buffered by the time the
+        // consumer is polled; merge them so each wakeup emits one response
+        // instead of one per token
+        let response_stream = response_stream
+            .ready_chunks(MAX_COALESCED_CHUNKS)
+            .flat_map(|batch| futures::stream::iter(coalesce_chunks(batch)));
+
         Ok(Box::pin(response_stream))
     }
 
@@ -227,4 +278,37 @@ mod tests {
         assert!(caps.supports_paged_attention);
         assert_eq!(caps.max_batch_size, 256);
     }
+
+    #[test]
+    fn test_coalesce_chunks() {
+        let chunk = |text: &str, finish: Option<&str>, stats: GenerationStats| {
+            Ok(GenerateResponse {
+                id: vllama_core::RequestId(0),
+                model: "test-model".to_string(),
+                text: text.to_string(),
+                tokens: Vec::new(),
+                finished: finish.is_some() || stats.total_tokens > 0,
+                stats,
+                finish_reason: finish.map(String::from),
+            })
+        };
+        let text_chunk = |text: &str, finish| chunk(text, finish, GenerationStats::new(0, 0));
+
+        let merged = coalesce_chunks(vec![
+            text_chunk("Hello", None),
+            text_chunk(",", None),
+            text_chunk(" world", Some("stop")),
+            // Usage chunk: no text or finish reason, just the token totals
+            chunk("", None, GenerationStats::new(4, 5)),
+        ]);
+
+        assert_eq!(merged.len(), 1);
+        let resp = merged.into_iter().next().unwrap().unwrap();
+        assert_eq!(resp.text, "Hello, world");
+        assert_eq!(resp.stats.prompt_tokens, 4);
+        assert_eq!(resp.stats.generated_tokens, 5);
+        assert_eq!(resp.stats.total_tokens, 9);
+        assert!(resp.finished);
+        assert_eq!(resp.finish_reason.as_deref(), Some("stop"));
+    }
 }
@@ -1,7 +1,7 @@
 use axum::{
-    extract::State,
-    http::StatusCode,
-    response::{IntoResponse, Response, sse::{Event, Sse}},
+    extract::{Query, State},
+    http::{HeaderName, StatusCode},
+    response::{IntoResponse, Response, sse::{Event, KeepAlive, Sse}},
     Json,
 };
 use futures::stream::{self};
@@ -9,13 +9,32 @@ use vllama_core::{ChatMessage, ChatRole, GenerateRequest, GenerateOptions};
 use vllama_engine::InferenceEngine;
 use serde::{Deserialize, Serialize};
 use std::collections::hash_map::DefaultHasher;
-use std::convert::Infallible;
 use std::hash::{Hash, Hasher};
-use std::time::Instant;
+use std::time::{Duration, Instant};
 use tracing::{error, info};
 
+use crate::dedup::DedupKey;
 use crate::state::ServerState;
 
+/// Build an SSE response that reaches the client token by token
+///
+/// Reverse proxies (nginx, Cloudflare) buffer `text/event-stream` unless told
+/// otherwise, which delays every token until the buffer fills. `Sse` already
+/// sets `Cache-Control: no-cache`; `X-Accel-Buffering: no` disables proxy
+/// buffering. Keep-alive comments stop idle connections being dropped while
+/// a long prompt prefills.
+fn sse_response<S, E>(stream: S) -> Response
+where
+    S: futures::Stream<Item = Result<Event, E>> + Send + 'static,
+    E: Into<axum::BoxError>,
+{
+    (
+        [(HeaderName::from_static("x-accel-buffering"), "no")],
+        Sse::new(stream).keep_alive(KeepAlive::default()),
+    )
+        .into_response()
+}
+
 fn messages_to_prompt(messages: &[ChatMessage]) -> String {
     messages
         .iter()
@@ -42,6 +61,20 @@ fn default_stream() -> bool {
     true
 }
 
+/// Query parameters accepted by `/api/generate`
+#[derive(Debug, Default, Deserialize)]
+pub struct GenerateQuery {
+    /// `?dedup=1` merges identical in-flight greedy (temperature 0) requests
+    #[serde(default)]
+    pub dedup: Option<String>,
+}
+
+impl GenerateQuery {
+    fn dedup(&self) -> bool {
+        matches!(self.dedup.as_deref(), Some("1") | Some("true"))
+    }
+}
+
 #[derive(Debug, Deserialize, Serialize)]
 pub struct GenerateOptionsApi {
     #[serde(default)]
@@ -60,6 +93,8 @@ pub struct GenerateApiResponse {
     #[serde(skip_serializing_if = "Option::is_none")]
     pub total_duration: Option<u64>,
     #[serde(skip_serializing_if = "Option::is_none")]
+    pub prompt_eval_count: Option<usize>,
+    #[serde(skip_serializing_if = "Option::is_none")]
     pub eval_count: Option<usize>,
 }
 
@@ -92,6 +127,8 @@ pub struct ChatApiResponse {
     #[serde(skip_serializing_if = "Option::is_none")]
     pub total_duration: Option<u64>,
     #[serde(skip_serializing_if = "Option::is_none")]
+    pub prompt_eval_count: Option<usize>,
+    #[serde(skip_serializing_if = "Option::is_none")]
     pub eval_count: Option<usize>,
 }
 
@@ -265,8 +302,34 @@ pub struct OpenAICompletionChunkChoice {
     pub finish_reason: Option<String>,
 }
 
+/// Request sampling overrides applied over the default sampling settings
+fn sampling_options(
+    temperature: Option<f32>,
+    top_p: Option<f32>,
+    max_tokens: Option<usize>,
+) -> GenerateOptions {
+    let mut gen_opts = GenerateOptions::default();
+    if let Some(temp) = temperature {
+        gen_opts.sampling.temperature = temp;
+    }
+    if let Some(top_p) = top_p {
+        gen_opts.sampling.top_p = top_p;
+    }
+    gen_opts.sampling.max_tokens = max_tokens;
+    gen_opts
+}
+
+/// Ollama-style request options applied over the default sampling settings
+fn generate_options(opts: Option<GenerateOptionsApi>) -> GenerateOptions {
+    match opts {
+        Some(opts) => sampling_options(opts.temperature, opts.top_p, opts.max_tokens),
+        None => GenerateOptions::default(),
+    }
+}
+
 pub async fn generate(
     State(state): State<ServerState>,
+    Query(query): Query<GenerateQuery>,
     Json(req): Json<GenerateApiRequest>,
 ) -> Response {
     info!("Generate request for model: {}", req.model);
@@ -274,25 +337,13 @@ pub async fn generate(
     let mut gen_req = GenerateRequest::new(
         0,  // Request ID
         req.model.clone(),
-        req.prompt.clone(),
+        req.prompt,
     );
 
-    if let Some(opts) = req.options {
-        let mut gen_opts = GenerateOptions::default();
-        if let Some(temp) = opts.temperature {
-            gen_opts.sampling.temperature = temp;
-        }
-        if let Some(top_p) = opts.top_p {
-            gen_opts.sampling.top_p = top_p;
-        }
-        if let Some(max_tokens) = opts.max_tokens {
-            gen_opts.sampling.max_tokens = Some(max_tokens);
-        }
-        gen_req.options = gen_opts;
-    }
+    gen_req.options = generate_options(req.options);
 
     if req.stream {
-        let engine = state.engine.lock().await;
+        let engine = state.engine.read().await;
         match engine.generate_stream(gen_req).await {
             Ok(stream) => {
                 use futures::StreamExt;
@@ -310,12 +361,12 @@ pub async fn generate(
                                     response: resp.text,
                                     done: false,
                                     total_duration: None,
+                                    prompt_eval_count: None,
                                     eval_count: None,
                                 };
-                                let json = serde_json::to_string(&event).unwrap();
                                 Some((
-                                    Ok::<_, Infallible>(Event::default().data(json)),
-                                    (s, model, count + 1, false)
+                                    Event::default().json_data(&event),
+                                    (s, model, count + resp.stats.generated_tokens, false)
                                 ))
                             }
                             Some(Err(e)) => {
@@ -328,16 +379,16 @@ pub async fn generate(
                                     response: String::new(),
                                     done: true,
                                     total_duration: None,
+                                    prompt_eval_count: None,
                                     eval_count: Some(count),
                                 };
-                                let json = serde_json::to_string(&final_event).unwrap();
-                                Some((Ok(Event::default().data(json)), (s, String::new(), count, true)))
+                                Some((Event::default().json_data(&final_event), (s, String::new(), count, true)))
                             }
                         }
                     }
                 );
 
-                Sse::new(event_stream).into_response()
+                sse_response(event_stream)
             }
             Err(e) => {
                 error!("Streaming generation failed: {}", e);
@@ -348,8 +399,32 @@ pub async fn generate(
         }
     } else {
         let start = Instant::now();
-        let engine = state.engine.lock().await;
-        match engine.generate(gen_req).await {
+
+        // Streaming requests are never merged; fanning out tokens isn't supported
+        let dedup_key = if query.dedup() {
+            DedupKey::for_request(&gen_req)
+        } else {
+            None
+        };
+
+        let result = match dedup_key {
+            Some(key) => {
+                let engine = state.engine.clone();
+                state
+                    .inflight
+                    .run(key, async move {
+                        let engine = engine.read().await;
+                        engine.generate(gen_req).await.map_err(|e| e.to_string())
+                    })
+                    .await
+            }
+            None => {
+                let engine = state.engine.read().await;
+                engine.generate(gen_req).await.map_err(|e| e.to_string())
+            }
+        };
+
+        match result {
             Ok(resp) => {
                 let duration = start.elapsed();
                 Json(GenerateApiResponse {
@@ -357,7 +432,8 @@ pub async fn generate(
                     response: resp.text,
                     done: true,
                     total_duration: Some(duration.as_nanos() as u64),
-                    eval_count: None,
+                    prompt_eval_count: Some(resp.stats.prompt_tokens),
+                    eval_count: Some(resp.stats.generated_tokens),
                 }).into_response()
             }
             Err(e) => {
@@ -370,13 +446,89 @@ pub async fn generate(
     }
 }
 
+/// One entry of a `/api/generate_batch` response
+#[derive(Debug, Serialize)]
+#[serde(untagged)]
+pub enum BatchGenerateResponse {
+    Ok(GenerateApiResponse),
+    Err { model: String, error: String },
+}
+
+/// Most prompts accepted in one `/api/generate_batch` call
+const MAX_BATCH_SIZE: usize = 256;
+
+/// Prompts of one batch in flight at once (the default `--max-num-seqs`)
+const BATCH_CONCURRENCY: usize = 64;
+
+/// Generate completions for many prompts in one HTTP call
+///
+/// Up to `BATCH_CONCURRENCY` prompts are in vLLM at a time, so its continuous
+/// batcher sees them together. Each prompt holds the engine read lock only
+/// while it runs, so a large batch doesn't keep model loading (and every
+/// request queued behind it) waiting. Responses are returned in request
+/// order; `stream` is ignored.
+pub async fn generate_batch(
+    State(state): State<ServerState>,
+    Json(reqs): Json<Vec<GenerateApiRequest>>,
+) -> Response {
+    use futures::StreamExt;
+
+    info!("Batch generate request with {} prompts", reqs.len());
+
+    if reqs.len() > MAX_BATCH_SIZE {
+        return (StatusCode::BAD_REQUEST, Json(serde_json::json!({
+            "error": format!("Batch too large: {} prompts (max {})", reqs.len(), MAX_BATCH_SIZE)
+        }))).into_response();
+    }
+
+    let start = Instant::now();
+    let engine = &state.engine;
+
+    let generations = stream::iter(reqs).map(|req| {
+        let model = req.model;
+        let mut gen_req = GenerateRequest::new(0, model.clone(), req.prompt);
+        gen_req.options = generate_options(req.options);
+
+        async move {
+            let result = engine.read().await.generate(gen_req).await;
+            match result {
+                Ok(resp) => BatchGenerateResponse::Ok(GenerateApiResponse {
+                    model,
+                    response: resp.text,
+                    done: true,
+                    total_duration: Some(start.elapsed().as_nanos() as u64),
+                    prompt_eval_count: Some(resp.stats.prompt_tokens),
+                    eval_count: Some(resp.stats.generated_tokens),
+                }),
+                Err(e) => {
+                    error!("Batch generation failed: {}", e);
+                    BatchGenerateResponse::Err {
+                        model,
+                        error: format!("Generation failed: {}", e),
+                    }
+                }
+            }
+        }
+    });
+
+    let responses: Vec<BatchGenerateResponse> =
+        generations.buffered(BATCH_CONCURRENCY).collect().await;
+
+    Json(responses).into_response()
+}
+
 pub async fn tags(State(state): State<ServerState>) -> Json<TagsResponse> {
     let mut models = Vec::new();
 
-    for entry in state.loaded_models.iter() {
-        let model_name = entry.key().clone();
+    // Collect names first so no DashMap guard is held across an await
+    let model_names: Vec<String> = state
+        .loaded_models
+        .iter()
+        .map(|entry| entry.key().clone())
+        .collect();
 
-        let size = match std::fs::metadata(&model_name) {
+    for model_name in model_names {
+        let size = match tokio::fs::metadata(&model_name).await {
             Ok(metadata) => metadata.len(),
             Err(_) => 0,
         };
@@ -413,7 +565,7 @@ pub struct HealthResponse {
     pub uptime_seconds: u64,
 }
 
-#[derive(Debug, Serialize)]
+#[derive(Debug, Clone, Serialize)]
 pub struct GpuInfo {
     pub name: String,
     pub memory_total_mb: String,
@@ -429,7 +581,27 @@ pub struct MemoryInfo {
     pub available_mb: u64,
 }
 
-pub async fn health(State(state): State<ServerState>) -> Json<HealthResponse> {
+/// Query parameters accepted by `/health`
+#[derive(Debug, Deserialize)]
+pub struct HealthQuery {
+    /// `?gpu=false` (or `?gpu=0`) skips the GPU section entirely
+    #[serde(default)]
+    pub gpu: Option<String>,
+}
+
+impl HealthQuery {
+    fn gpu(&self) -> bool {
+        !matches!(self.gpu.as_deref(), Some("0") | Some("false"))
+    }
+}
+
+/// How long nvidia-smi output is reused between /health calls
+const GPU_INFO_TTL: Duration = Duration::from_secs(2);
+
+pub async fn health(
+    State(state): State<ServerState>,
+    Query(query): Query<HealthQuery>,
+) -> Json<HealthResponse> {
     use sysinfo::System;
 
     // Check vLLM server status
@@ -442,18 +614,31 @@ pub async fn health(State(state): State<ServerState>) -> Json<HealthResponse> {
         .map(|entry| entry.key().clone())
         .collect();
 
-    // Get GPU info via nvidia-smi
-    let gpu = get_gpu_info().await;
+    // Get GPU info via nvidia-smi (cached, since dashboards poll /health)
+    let gpu = if query.gpu() {
+        cached_gpu_info(&state).await
+    } else {
+        None
+    };
 
-    // Get system memory info
-    let mut sys = System::new_all();
-    sys.refresh_memory();
+    // Get system memory info (sysinfo reads /proc synchronously, so keep it
+    // off the async workers; only memory is needed, not a full process scan)
+    let memory = tokio::task::spawn_blocking(|| {
+        let mut sys = System::new();
+        sys.refresh_memory();
 
-    let memory = MemoryInfo {
-        total_mb: sys.total_memory() / 1024 / 1024,
-        used_mb: sys.used_memory() / 1024 / 1024,
-        available_mb: sys.available_memory() / 1024 / 1024,
-    };
+        MemoryInfo {
+            total_mb: sys.total_memory() / 1024 / 1024,
+            used_mb: sys.used_memory() / 1024 / 1024,
+            available_mb: sys.available_memory() / 1024 / 1024,
+        }
+    })
+    .await
+    .unwrap_or(MemoryInfo {
+        total_mb: 0,
+        used_mb: 0,
+        available_mb: 0,
+    });
 
     // Calculate uptime (simplified - just return 0 for now, could be enhanced)
     let uptime_seconds = 0;
@@ -485,6 +670,52 @@ async fn check_vllm_health() -> String {
     }
 }
 
+/// Prometheus scheduler metrics (running/waiting requests, KV cache usage,
+/// preemptions) taken from vLLM's own `/metrics` endpoint
+pub async fn metrics() -> Response {
+    let client = reqwest::Client::new();
+    let text = match client
+        .get("http://127.0.0.1:8100/metrics")
+        .timeout(std::time::Duration::from_secs(2))
+        .send()
+        .await
+    {
+        Ok(resp) if resp.status().is_success() => resp.text().await,
+        Ok(resp) => {
+            error!("vLLM metrics returned HTTP {}", resp.status());
+            return (StatusCode::BAD_GATEWAY, "vLLM metrics unavailable\n").into_response();
+        }
+        Err(e) => Err(e),
+    };
+
+    match text {
+        Ok(text) => (
+            [(axum::http::header::CONTENT_TYPE, "text/plain; version=0.0.4; charset=utf-8")],
+            crate::metrics::scheduler_metrics(&text),
+        )
+            .into_response(),
+        Err(e) => {
+            error!("Failed to query vLLM metrics: {}", e);
+            (StatusCode::SERVICE_UNAVAILABLE, "vLLM server not available\n").into_response()
+        }
+    }
+}
+
+/// GPU info from the last nvidia-smi run, refreshed once it is older than
+/// `GPU_INFO_TTL`. A missing GPU is cached too, so hosts without nvidia-smi
+/// don't try to spawn it on every call.
+async fn cached_gpu_info(state: &ServerState) -> Option<GpuInfo> {
+    if let Some((fetched_at, gpu)) = state.gpu_info.lock().as_ref() {
+        if fetched_at.elapsed() < GPU_INFO_TTL {
+            return gpu.clone();
+        }
+    }
+
+    let gpu = get_gpu_info().await;
+    *state.gpu_info.lock() = Some((Instant::now(), gpu.clone()));
+    gpu
+}
+
 async fn get_gpu_info() -> Option<GpuInfo> {
     // Query nvidia-smi for GPU information
     let output = tokio::process::Command::new("nvidia-smi")
@@ -560,7 +791,7 @@ pub async fn pull(
             ).await;
 
             if let Ok(model_path) = result {
-                let mut engine = engine_clone.lock().await;
+                let mut engine = engine_clone.write().await;
                 if let Ok(handle) = engine.load_model(&model_path).await {
                     loaded_models_clone.insert(model_name, handle);
                 }
@@ -579,7 +810,7 @@ pub async fn pull(
                             completed: if progress.downloaded > 0 { Some(progress.downloaded) } else { None },
                         };
                         Some((
-                            Ok::<_, Infallible>(Event::default().data(serde_json::to_string(&event).unwrap())),
+                            Event::default().json_data(&event),
                             receiver
                         ))
                     }
@@ -591,7 +822,7 @@ pub async fn pull(
                             completed: None,
                         };
                         Some((
-                            Ok(Event::default().data(serde_json::to_string(&final_event).unwrap())),
+                            Event::default().json_data(&final_event),
                             receiver
                         ))
                     }
@@ -599,11 +830,11 @@ pub async fn pull(
             }
         );
 
-        Sse::new(event_stream).into_response()
+        sse_response(event_stream)
     } else {
         match downloader.download_model(&req.model, |_| {}).await {
             Ok(model_path) => {
-                let mut engine = state.engine.lock().await;
+                let mut engine = state.engine.write().await;
                 match engine.load_model(&model_path).await {
                     Ok(handle) => {
                         state.loaded_models.insert(req.model.clone(), handle);
@@ -744,14 +975,7 @@ pub async fn openai_chat_completions(
         prompt,
     );
 
-    let mut gen_opts = GenerateOptions::default();
-    if let Some(temp) = req.temperature {
-        gen_opts.sampling.temperature = temp;
-    }
-    if let Some(max_tokens) = req.max_tokens {
-        gen_opts.sampling.max_tokens = Some(max_tokens);
-    }
-    gen_req.options = gen_opts;
+    gen_req.options = sampling_options(req.temperature, None, req.max_tokens);
 
     let request_id = format!("chatcmpl-{:x}", std::time::SystemTime::now()
         .duration_since(std::time::UNIX_EPOCH)
@@ -763,7 +987,7 @@ pub async fn openai_chat_completions(
         .as_secs();
 
     if req.stream {
-        let engine = state.engine.lock().await;
+        let engine = state.engine.read().await;
         match engine.generate_stream(gen_req).await {
             Ok(stream) => {
                 use futures::StreamExt;
@@ -790,10 +1014,9 @@ pub async fn openai_chat_completions(
                                         finish_reason: None,
                                     }],
                                 };
-                                let json = serde_json::to_string(&chunk).unwrap();
                                 Some((
-                                    Ok::<_, Infallible>(Event::default().data(json)),
-                                    (s, model, id, timestamp, count + 1, false)
+                                    Event::default().json_data(&chunk),
+                                    (s, model, id, timestamp, count + resp.stats.generated_tokens, false)
                                 ))
                             }
                             Some(Err(e)) => {
@@ -815,14 +1038,13 @@ pub async fn openai_chat_completions(
                                         finish_reason: Some("stop".to_string()),
                                     }],
                                 };
-                                let json = serde_json::to_string(&final_chunk).unwrap();
-                                Some((Ok(Event::default().data(json)), (s, String::new(), String::new(), timestamp, count, true)))
+                                Some((Event::default().json_data(&final_chunk), (s, String::new(), String::new(), timestamp, count, true)))
                             }
                         }
                     }
                 );
 
-                Sse::new(event_stream).into_response()
+                sse_response(event_stream)
             }
             Err(e) => {
                 error!("Streaming chat failed: {}", e);
@@ -835,7 +1057,7 @@ pub async fn openai_chat_completions(
             }
         }
     } else {
-        let engine = state.engine.lock().await;
+        let engine = state.engine.read().await;
         match engine.generate(gen_req).await {
             Ok(resp) => {
                 let response = OpenAIChatResponse {
@@ -849,9 +1071,9 @@ pub async fn openai_chat_completions(
                         finish_reason: "stop".to_string(),
                     }],
                     usage: Some(OpenAIUsage {
-                        prompt_tokens: 0,
-                        completion_tokens: 0,
-                        total_tokens: 0,
+                        prompt_tokens: resp.stats.prompt_tokens,
+                        completion_tokens: resp.stats.generated_tokens,
+                        total_tokens: resp.stats.total_tokens,
                     }),
                 };
                 Json(response).into_response()
@@ -875,50 +1097,38 @@ pub async fn chat(
 ) -> Response {
     info!("Chat request for model: {}", req.model);
 
-    let mut gen_opts = GenerateOptions::default();
-    if let Some(opts) = req.options {
-        if let Some(temp) = opts.temperature {
-            gen_opts.sampling.temperature = temp;
-        }
-        if let Some(top_p) = opts.top_p {
-            gen_opts.sampling.top_p = top_p;
-        }
-        if let Some(max_tokens) = opts.max_tokens {
-            gen_opts.sampling.max_tokens = Some(max_tokens);
-        }
-    }
+    let gen_opts = generate_options(req.options);
 
     if req.stream {
         // Streaming still uses prompt-based approach
         let prompt = messages_to_prompt(&req.messages);
         let mut gen_req = GenerateRequest::new(0, req.model.clone(), prompt);
         gen_req.options = gen_opts;
-        let engine = state.engine.lock().await;
+        let engine = state.engine.read().await;
         match engine.generate_stream(gen_req).await {
             Ok(stream) => {
                 use futures::StreamExt;
 
                 let event_stream = stream::unfold(
-                    (stream, req.model.clone(), String::new(), 0usize, false),
-                    |(mut s, model, mut accumulated, count, done)| async move {
+                    (stream, req.model.clone(), 0usize, false),
+                    |(mut s, model, count, done)| async move {
                         if done {
                             return None;
                         }
                         match s.next().await {
                             Some(Ok(resp)) => {
-                                accumulated.push_str(&resp.text);
                                 let msg = ChatMessage::assistant(resp.text);
                                 let event = ChatApiResponse {
                                     model: model.clone(),
                                     message: msg,
                                     done: false,
                                     total_duration: None,
+                                    prompt_eval_count: None,
                                     eval_count: None,
                                 };
-                                let json = serde_json::to_string(&event).unwrap();
                                 Some((
-                                    Ok::<_, Infallible>(Event::default().data(json)),
-                                    (s, model, accumulated, count + 1, false)
+                                    Event::default().json_data(&event),
+                                    (s, model, count + resp.stats.generated_tokens, false)
                                 ))
                             }
                             Some(Err(e)) => {
@@ -932,16 +1142,16 @@ pub async fn chat(
                                     message: msg,
                                     done: true,
                                     total_duration: None,
+                                    prompt_eval_count: None,
                                     eval_count: Some(count),
                                 };
-                                let json = serde_json::to_string(&final_event).unwrap();
-                                Some((Ok(Event::default().data(json)), (s, String::new(), accumulated, count, true)))
+                                Some((Event::default().json_data(&final_event), (s, String::new(), count, true)))
                             }
                         }
                     }
                 );
 
-                Sse::new(event_stream).into_response()
+                sse_response(event_stream)
             }
             Err(e) => {
                 error!("Streaming chat failed: {}", e);
@@ -953,8 +1163,8 @@ pub async fn chat(
     } else {
         // Non-streaming: use proper chat completion endpoint
         let start = Instant::now();
-        let engine = state.engine.lock().await;
-        match engine.generate_chat_completion(req.model.clone(), req.messages.clone(), gen_opts).await {
+        let engine = state.engine.read().await;
+        match engine.generate_chat_completion(req.model.clone(), req.messages, gen_opts).await {
             Ok(chat_response) => {
                 let duration = start.elapsed();
                 let message = chat_response.choices
@@ -976,6 +1186,7 @@ pub async fn chat(
                     message: msg,
                     done: true,
                     total_duration: Some(duration.as_nanos() as u64),
+                    prompt_eval_count: Some(chat_response.usage.prompt_tokens),
                     eval_count: Some(chat_response.usage.completion_tokens),
                 }).into_response()
             }
@@ -1178,20 +1389,10 @@ pub async fn openai_completions(
     let mut gen_req = GenerateRequest::new(
         0,  // Request ID
         req.model.clone(),
-        req.prompt.clone(),
+        req.prompt,
     );
 
-    let mut gen_opts = GenerateOptions::default();
-    if let Some(temp) = req.temperature {
-        gen_opts.sampling.temperature = temp;
-    }
-    if let Some(max_tokens) = req.max_tokens {
-        gen_opts.sampling.max_tokens = Some(max_tokens);
-    }
-    if let Some(top_p) = req.top_p {
-        gen_opts.sampling.top_p = top_p;
-    }
-    gen_req.options = gen_opts;
+    gen_req.options = sampling_options(req.temperature, req.top_p, req.max_tokens);
 
     let request_id = format!("cmpl-{:x}", std::time::SystemTime::now()
         .duration_since(std::time::UNIX_EPOCH)
@@ -1203,7 +1404,7 @@ pub async fn openai_completions(
         .as_secs();
 
     if req.stream {
-        let engine = state.engine.lock().await;
+        let engine = state.engine.read().await;
         match engine.generate_stream(gen_req).await {
             Ok(stream) => {
                 use futures::StreamExt;
@@ -1222,17 +1423,14 @@ pub async fn openai_completions(
                                     created: timestamp,
                                     model: model.clone(),
                                     choices: vec![OpenAICompletionChunkChoice {
-                                        text: resp.text.clone(),
+                                        text: resp.text,
                                         index: 0,
                                         finish_reason: if resp.finished { Some("stop".to_string()) } else { None },
                                     }],
                                 };
 
-                                let json = serde_json::to_string(&chunk).unwrap();
-                                let event = Event::default()
-                                    .data(json);
-
-                                Some((Ok::<_, Infallible>(event), (s, model, id, timestamp, resp.finished)))
+                                let finished = resp.finished;
+                                Some((Event::default().json_data(&chunk), (s, model, id, timestamp, finished)))
                             }
                             Some(Err(e)) => {
                                 error!("Stream error: {}", e);
@@ -1243,7 +1441,7 @@ pub async fn openai_completions(
                     }
                 );
 
-                Sse::new(event_stream).into_response()
+                sse_response(event_stream)
             }
             Err(e) => {
                 error!("Failed to generate stream: {}", e);
@@ -1260,7 +1458,7 @@ pub async fn openai_completions(
             }
         }
     } else {
-        let engine = state.engine.lock().await;
+        let engine = state.engine.read().await;
         match engine.generate(gen_req).await {
             Ok(resp) => {
                 let response = OpenAICompletionResponse {
@@ -1274,9 +1472,9 @@ pub async fn openai_completions(
                         finish_reason: "stop".to_string(),
                     }],
                     usage: Some(OpenAIUsage {
-                        prompt_tokens: 0,  // vLLM doesn't return this easily
-                        completion_tokens: 0,
-                        total_tokens: 0,
+                        prompt_tokens: resp.stats.prompt_tokens,
+                        completion_tokens: resp.stats.generated_tokens,
+                        total_tokens: resp.stats.total_tokens,
                     }),
                 };
 
@@ -0,0 +1,165 @@
+//! In-flight request deduplication
+//!
+//! Identical greedy (temperature 0) generations that arrive while one is
+//! already running wait for that request's result instead of being decoded
+//! again. Sampled requests are never merged since their outputs differ.
+
+use dashmap::mapref::entry::Entry;
+use dashmap::DashMap;
+use futures::future::{BoxFuture, FutureExt, Shared};
+use std::future::Future;
+use std::sync::Arc;
+use vllama_core::{GenerateRequest, GenerateResponse};
+
+type SharedGeneration = Shared<BoxFuture<'static, Result<GenerateResponse, String>>>;
+
+/// Everything that determines the output of a greedy generation
+#[derive(Debug, Clone, PartialEq, Eq, Hash)]
+pub struct DedupKey {
+    model: String,
+    prompt: String,
+    top_p: u32,
+    max_tokens: Option<usize>,
+}
+
+impl DedupKey {
+    /// Key for `request`, or `None` if its output is not deterministic
+    pub fn for_request(request: &GenerateRequest) -> Option<Self> {
+        let sampling = &request.options.sampling;
+        if sampling.temperature != 0.0 {
+            return None;
+        }
+
+        Some(Self {
+            model: request.model.clone(),
+            prompt: request.prompt.clone(),
+            top_p: sampling.top_p.to_bits(),
+            max_tokens: sampling.max_tokens,
+        })
+    }
+}
+
+/// Generations currently running, keyed by their inputs
+#[derive(Clone, Default)]
+pub struct InflightRequests {
+    requests: Arc<DashMap<DedupKey, SharedGeneration>>,
+}
+
+impl InflightRequests {
+    pub fn new() -> Self {
+        Self::default()
+    }
+
+    /// Run `generate`, or wait for an identical generation already in flight
+    pub async fn run<F>(&self, key: DedupKey, generate: F) -> Result<GenerateResponse, String>
+    where
+        F: Future<Output = Result<GenerateResponse, String>> + Send + 'static,
+    {
+        let (shared, leader) = match self.requests.entry(key.clone()) {
+            Entry::Occupied(entry) => (entry.get().clone(), false),
+            Entry::Vacant(entry) => {
+                // Run the generation in a task of its own so a panic reaches
+                // every waiter as an error instead of poisoning the shared
+                // future (and the driver below) for all later requests
+                let task = tokio::spawn(generate);
+                let shared = async move {
+                    task.await
+                        .unwrap_or_else(|e| Err(format!("Generation task failed: {}", e)))
+                }
+                .boxed()
+                .shared();
+                entry.insert(shared.clone());
+                (shared, true)
+            }
+        };
+
+        if leader {
+            // Clean up in a task of its own so the entry is removed even if
+            // every waiting client disconnects
+            let requests = self.requests.clone();
+            let driver = shared.clone();
+            tokio::spawn(async move {
+                let _ = driver.await;
+                requests.remove(&key);
+            });
+        }
+
+        shared.await
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use std::sync::atomic::{AtomicUsize, Ordering};
+    use std::time::Duration;
+    use vllama_core::RequestId;
+
+    fn greedy_request(prompt: &str) -> GenerateRequest {
+        GenerateRequest::new(0, "test-model".to_string(), prompt.to_string()).with_temperature(0.0)
+    }
+
+    #[test]
+    fn test_key_only_for_greedy_requests() {
+        assert!(DedupKey::for_request(&greedy_request("Hello")).is_some());
+
+        let sampled = greedy_request("Hello").with_temperature(0.7);
+        assert!(DedupKey::for_request(&sampled).is_none());
+
+        assert_ne!(
+            DedupKey::for_request(&greedy_request("Hello")),
+            DedupKey::for_request(&greedy_request("Hello").with_max_tokens(10))
+        );
+    }
+
+    #[tokio::test]
+    async fn test_identical_requests_share_one_generation() {
+        let inflight = InflightRequests::new();
+        let calls = Arc::new(AtomicUsize::new(0));
+        let key = DedupKey::for_request(&greedy_request("Hello")).unwrap();
+
+        let generate = || {
+            let calls = calls.clone();
+            async move {
+                calls.fetch_add(1, Ordering::SeqCst);
+                tokio::time::sleep(Duration::from_millis(50)).await;
+                Ok::<_, String>(
+                    GenerateResponse::new(RequestId(0), "test-model".to_string())
+                        .with_text("world".to_string()),
+                )
+            }
+        };
+
+        let (first, second) = tokio::join!(
+            inflight.run(key.clone(), generate()),
+            inflight.run(key, generate()),
+        );
+
+        assert_eq!(calls.load(Ordering::SeqCst), 1);
+        assert_eq!(first.unwrap().text, "world");
+        assert_eq!(second.unwrap().text, "world");
+    }
+
+    #[tokio::test]
+    async fn test_panicking_generation_is_removed() {
+        let inflight = InflightRequests::new();
+        let key = DedupKey::for_request(&greedy_request("Hello")).unwrap();
+
+        let result = inflight.run(key.clone(), async { panic!("generation panicked") }).await;
+        assert!(result.is_err());
+
+        // The driver task removes the entry once the generation resolves
+        tokio::time::sleep(Duration::from_millis(10)).await;
+        assert!(inflight.requests.is_empty());
+
+        let retry = inflight
+            .run(key, async {
+                Ok::<_, String>(
+                    GenerateResponse::new(RequestId(0), "test-model".to_string())
+                        .with_text("world".to_string()),
+                )
+            })
+            .await;
+        assert_eq!(retry.unwrap().text, "world");
+    }
+}
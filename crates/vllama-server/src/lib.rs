@@ -1,4 +1,6 @@
 mod api;
+mod dedup;
+mod metrics;
 mod server;
 mod state;
 
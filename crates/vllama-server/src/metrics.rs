@@ -0,0 +1,71 @@
+//! Scheduler metrics from vLLM's Prometheus endpoint
+//!
+//! vLLM already tracks batch state every engine step; `/metrics` passes the
+//! series that matter for tuning `--max-num-seqs` and
+//! `--max-num-batched-tokens` through instead of recomputing them per request.
+
+/// Metric names kept from vLLM's output. Both the V0 and V1 spellings are
+/// listed since the names changed between vLLM releases.
+const SCHEDULER_METRICS: [&str; 9] = [
+    "vllm:num_requests_running",
+    "vllm:num_requests_waiting",
+    "vllm:num_requests_swapped",
+    "vllm:gpu_cache_usage_perc",
+    "vllm:kv_cache_usage_perc",
+    "vllm:num_preemptions",
+    "vllm:num_preemptions_total",
+    "vllm:prompt_tokens_total",
+    "vllm:generation_tokens_total",
+];
+
+/// Metric name a Prometheus text line belongs to, if any
+fn metric_name(line: &str) -> Option<&str> {
+    let line = match line.strip_prefix('#') {
+        // `# HELP <name> ...` and `# TYPE <name> ...`
+        Some(comment) => comment.split_whitespace().nth(1)?,
+        None => line,
+    };
+    line.split(|c: char| c == '{' || c.is_whitespace()).next()
+}
+
+/// Keep only the scheduler series (with their HELP/TYPE lines) from vLLM's
+/// `/metrics` output
+pub fn scheduler_metrics(text: &str) -> String {
+    let mut out = String::new();
+    for line in text.lines() {
+        if metric_name(line).is_some_and(|name| SCHEDULER_METRICS.contains(&name)) {
+            out.push_str(line);
+            out.push('\n');
+        }
+    }
+    out
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_scheduler_metrics() {
+        let text = "\
+# HELP vllm:num_requests_running Number of requests in model execution batches.
+# TYPE vllm:num_requests_running gauge
+vllm:num_requests_running{engine=\"0\",model_name=\"facebook/opt-125m\"} 12.0
+# HELP vllm:num_preemptions_total Cumulative number of preemption from the engine.
+# TYPE vllm:num_preemptions_total counter
+vllm:num_preemptions_total{engine=\"0\",model_name=\"facebook/opt-125m\"} 3.0
+# HELP python_gc_objects_collected_total Objects collected during gc
+# TYPE python_gc_objects_collected_total counter
+python_gc_objects_collected_total{generation=\"0\"} 1234.0
+vllm:num_requests_running_extra 1.0
+";
+
+        let filtered = scheduler_metrics(text);
+
+        assert_eq!(filtered.lines().count(), 6);
+        assert!(filtered.contains("vllm:num_requests_running{engine=\"0\",model_name=\"facebook/opt-125m\"} 12.0"));
+        assert!(filtered.contains("# TYPE vllm:num_preemptions_total counter"));
+        assert!(!filtered.contains("python_gc"));
+        assert!(!filtered.contains("_extra"));
+    }
+}
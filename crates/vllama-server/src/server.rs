@@ -7,7 +7,6 @@ use axum::{
 use tower_http::cors::CorsLayer;
 use tower_http::trace::TraceLayer;
 use tracing::{info, Span};
-use std::time::Instant;
 use uuid::Uuid;
 
 use crate::api;
@@ -47,10 +46,6 @@ impl Server {
                     status = tracing::field::Empty,
                 )
             })
-            .on_request(|_request: &Request<Body>, _span: &Span| {
-                // Record request start time
-                _span.record("start_time", Instant::now().elapsed().as_millis() as u64);
-            })
             .on_response(|response: &Response<Body>, latency: std::time::Duration, span: &Span| {
                 let latency_ms = latency.as_millis() as u64;
                 let status = response.status().as_u16();
@@ -68,6 +63,7 @@ impl Server {
         let app = Router::new()
             // Ollama-compatible API
             .route("/api/generate", post(api::generate))
+            .route("/api/generate_batch", post(api::generate_batch))
             .route("/api/chat", post(api::chat))
             .route("/api/pull", post(api::pull))
             .route("/api/show", post(api::show))
@@ -80,6 +76,7 @@ impl Server {
             .route("/v1/chat/completions", post(api::openai_chat_completions))
             // Health check
             .route("/health", get(api::health))
+            .route("/metrics", get(api::metrics))
             .layer(CorsLayer::permissive())
             .layer(trace_layer)
             .with_state(self.state);
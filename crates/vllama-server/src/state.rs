@@ -1,13 +1,24 @@
 use dashmap::DashMap;
+use parking_lot::Mutex;
 use vllama_engine::VllmOpenAIEngine;
 use vllama_core::ModelHandle;
-use tokio::sync::Mutex;
+use tokio::sync::RwLock;
 use std::sync::Arc;
+use std::time::Instant;
+
+use crate::api::GpuInfo;
+use crate::dedup::InflightRequests;
 
 #[derive(Clone)]
 pub struct ServerState {
-    pub engine: Arc<Mutex<VllmOpenAIEngine>>,
+    /// Generation only needs shared access, so concurrent requests take read
+    /// locks; model loading takes the write lock.
+    pub engine: Arc<RwLock<VllmOpenAIEngine>>,
     pub loaded_models: Arc<DashMap<String, ModelHandle>>,
+    /// Greedy generations in flight, shared by identical `?dedup=1` requests
+    pub(crate) inflight: InflightRequests,
+    /// Last nvidia-smi result and when it was taken
+    pub(crate) gpu_info: Arc<Mutex<Option<(Instant, Option<GpuInfo>)>>>,
 }
 
 impl ServerState {
@@ -15,8 +26,10 @@ impl ServerState {
         let engine = VllmOpenAIEngine::new("http://127.0.0.1:8100");
 
         Ok(Self {
-            engine: Arc::new(Mutex::new(engine)),
+            engine: Arc::new(RwLock::new(engine)),
             loaded_models: Arc::new(DashMap::new()),
+            inflight: InflightRequests::new(),
+            gpu_info: Arc::new(Mutex::new(None)),
         })
     }
 }
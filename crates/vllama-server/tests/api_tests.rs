@@ -1,4 +1,3 @@
-use reqwest;
 use serde_json::json;
 use std::time::Duration;
 
@@ -30,6 +29,24 @@ async fn wait_for_server() -> Result<(), Box<dyn std::error::Error>> {
     Err("Server not available after retries".into())
 }
 
+/// Name of the first model reported by /api/ps, if any
+async fn first_running_model(client: &reqwest::Client) -> Option<String> {
+    let ps_json: serde_json::Value = client
+        .get(&format!("{}/api/ps", BASE_URL))
+        .send()
+        .await
+        .expect("Failed to get models")
+        .json()
+        .await
+        .expect("Failed to parse JSON");
+
+    ps_json["models"]
+        .as_array()
+        .expect("models should be array")
+        .first()
+        .map(|model| model["name"].as_str().expect("name should be string").to_string())
+}
+
 #[tokio::test]
 #[ignore] // Run with: cargo test -- --ignored --test-threads=1
 async fn test_health_endpoint() {
@@ -49,6 +66,53 @@ async fn test_health_endpoint() {
     assert!(json.get("gpu").is_some());
 }
 
+#[tokio::test]
+#[ignore]
+async fn test_health_endpoint_without_gpu() {
+    wait_for_server().await.expect("Server must be running");
+
+    let client = get_client();
+    for value in ["false", "0"] {
+        let response = client
+            .get(&format!("{}/health?gpu={}", BASE_URL, value))
+            .send()
+            .await
+            .expect("Failed to send request");
+
+        assert!(response.status().is_success());
+        let json: serde_json::Value = response.json().await.expect("Failed to parse JSON");
+        assert_eq!(json["status"], "ok");
+        assert!(json.get("gpu").is_none());
+    }
+}
+
+#[tokio::test]
+#[ignore]
+async fn test_metrics_endpoint() {
+    wait_for_server().await.expect("Server must be running");
+
+    let client = get_client();
+    let response = client
+        .get(&format!("{}/metrics", BASE_URL))
+        .send()
+        .await
+        .expect("Failed to send request");
+
+    assert!(response.status().is_success());
+
+    let content_type = response
+        .headers()
+        .get(reqwest::header::CONTENT_TYPE)
+        .and_then(|v| v.to_str().ok())
+        .unwrap_or_default()
+        .to_string();
+    assert!(content_type.starts_with("text/plain; version=0.0.4"));
+
+    let body = response.text().await.expect("Failed to read body");
+    assert!(body.lines().any(|line| line.starts_with("vllm:num_requests_running")));
+    assert!(!body.contains("python_gc"));
+}
+
 #[tokio::test]
 #[ignore]
 async fn test_version_endpoint() {
@@ -208,6 +272,127 @@ async fn test_generate_endpoint_non_streaming() {
     assert!(json.get("done").is_some());
     assert_eq!(json["done"], true);
     assert!(json["response"].as_str().unwrap().len() > 0);
+
+    // Token counts come from vLLM's usage, not word splitting
+    assert!(json["prompt_eval_count"].as_u64().unwrap() > 0);
+    assert!(json["eval_count"].as_u64().unwrap() > 0);
+}
+
+#[tokio::test]
+#[ignore]
+async fn test_generate_endpoint_dedup() {
+    wait_for_server().await.expect("Server must be running");
+
+    let client = get_client();
+    let Some(model_name) = first_running_model(&client).await else {
+        println!("Skipping test_generate_endpoint_dedup: no models running");
+        return;
+    };
+
+    let request = json!({
+        "model": model_name,
+        "prompt": "Count from one to five:",
+        "stream": false,
+        "options": {
+            "temperature": 0.0,
+            "max_tokens": 10
+        }
+    });
+    let send = || {
+        client
+            .post(&format!("{}/api/generate?dedup=1", BASE_URL))
+            .json(&request)
+            .send()
+    };
+
+    // Identical greedy requests in flight together share one generation
+    let (first, second) = tokio::join!(send(), send());
+    let first = first.expect("Failed to send request");
+    let second = second.expect("Failed to send request");
+    assert!(first.status().is_success());
+    assert!(second.status().is_success());
+
+    let first: serde_json::Value = first.json().await.expect("Failed to parse JSON");
+    let second: serde_json::Value = second.json().await.expect("Failed to parse JSON");
+    assert_eq!(first["done"], true);
+    assert!(first["response"].as_str().unwrap().len() > 0);
+    assert_eq!(first["response"], second["response"]);
+    assert_eq!(first["eval_count"], second["eval_count"]);
+}
+
+#[tokio::test]
+#[ignore]
+async fn test_generate_batch_endpoint() {
+    wait_for_server().await.expect("Server must be running");
+
+    let client = get_client();
+    let Some(model_name) = first_running_model(&client).await else {
+        println!("Skipping test_generate_batch_endpoint: no models running");
+        return;
+    };
+
+    // Distinct token limits make the response order checkable
+    let max_tokens = [1u64, 4, 12];
+    let requests: Vec<_> = max_tokens
+        .iter()
+        .map(|&max| {
+            json!({
+                "model": model_name,
+                "prompt": "Once upon a time",
+                "options": {
+                    "temperature": 0.0,
+                    "max_tokens": max
+                }
+            })
+        })
+        .collect();
+
+    let response = client
+        .post(&format!("{}/api/generate_batch", BASE_URL))
+        .json(&requests)
+        .send()
+        .await
+        .expect("Failed to send request");
+
+    assert!(response.status().is_success());
+
+    let json: serde_json::Value = response.json().await.expect("Failed to parse JSON");
+    let results = json.as_array().expect("response should be array");
+    assert_eq!(results.len(), max_tokens.len());
+
+    for (result, &max) in results.iter().zip(&max_tokens) {
+        assert_eq!(result["model"], model_name.as_str());
+        assert_eq!(result["done"], true);
+        assert!(result["prompt_eval_count"].as_u64().unwrap() > 0);
+
+        let eval_count = result["eval_count"].as_u64().unwrap();
+        assert!(eval_count > 0 && eval_count <= max);
+    }
+    assert_eq!(results[0]["eval_count"], 1);
+    assert!(results[2]["eval_count"].as_u64().unwrap() > 1);
+}
+
+#[tokio::test]
+#[ignore]
+async fn test_generate_batch_too_large() {
+    wait_for_server().await.expect("Server must be running");
+
+    let client = get_client();
+    let requests: Vec<_> = (0..257)
+        .map(|_| json!({"model": "facebook/opt-125m", "prompt": "Hi"}))
+        .collect();
+
+    let response = client
+        .post(&format!("{}/api/generate_batch", BASE_URL))
+        .json(&requests)
+        .send()
+        .await
+        .expect("Failed to send request");
+
+    assert_eq!(response.status(), 400);
+
+    let json: serde_json::Value = response.json().await.expect("Failed to parse JSON");
+    assert!(json.get("error").is_some());
 }
 
 #[tokio::test]
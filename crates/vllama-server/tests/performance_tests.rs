@@ -1,4 +1,3 @@
-use reqwest;
 use serde_json::json;
 use std::time::{Duration, Instant};
 use tokio::task::JoinSet;
@@ -6,9 +6,14 @@ Tests with 5, 10, 50 concurrent requests
 
 import asyncio
 import httpx
+import json
 import time
 from typing import List
 
+# Enough pooled connections for the largest sweep so no request waits on the pool
+CLIENT_LIMITS = httpx.Limits(max_connections=256, max_keepalive_connections=256)
+CLIENT_TIMEOUT = httpx.Timeout(60.0)
+
 async def make_request(client: httpx.AsyncClient, prompt: str) -> float:
     """Make a single request and return latency"""
     start = time.time()
@@ -20,13 +25,98 @@ async def make_request(client: httpx.AsyncClient, prompt: str) -> float:
             "stream": False,
             "options": {"max_tokens": 50}
         },
-        timeout=30.0
     )
     latency = time.time() - start
     response.raise_for_status()
     return latency
 
-async def benchmark_concurrent(num_requests: int) -> dict:
+async def make_streaming_request(client: httpx.AsyncClient, prompt: str) -> dict:
+    """Stream a single request and return time to first token and per-token time"""
+    start = time.time()
+    ttft = None
+    eval_count = 0
+    async with client.stream(
+        "POST",
+        "http://localhost:11434/api/generate",
+        json={
+            "model": "facebook/opt-125m",
+            "prompt": prompt,
+            "stream": True,
+            "options": {"max_tokens": 50}
+        },
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            event = json.loads(line[len("data:"):])
+            if ttft is None and event.get("response"):
+                ttft = time.time() - start
+            if event.get("done"):
+                eval_count = event.get("eval_count") or 0
+    total = time.time() - start
+    ttft = ttft if ttft is not None else total
+    # Tokens after the first arrive at the per-output-token rate
+    tpot = (total - ttft) / max(eval_count - 1, 1)
+    return {"ttft": ttft, "tpot": tpot}
+
+async def benchmark_streaming(client: httpx.AsyncClient, num_requests: int) -> dict:
+    """Run concurrent streaming requests and report TTFT separately from TPOT"""
+    prompt = "Explain quantum computing in simple terms"
+
+    timings = await asyncio.gather(
+        *[make_streaming_request(client, prompt) for _ in range(num_requests)]
+    )
+
+    results = {
+        "num_requests": num_requests,
+        "avg_ttft": sum(t["ttft"] for t in timings) / len(timings),
+        "max_ttft": max(t["ttft"] for t in timings),
+        "avg_tpot": sum(t["tpot"] for t in timings) / len(timings),
+    }
+
+    print(f"✓ Streaming {num_requests}: avg TTFT {results['avg_ttft']*1000:.0f}ms, "
+          f"max TTFT {results['max_ttft']*1000:.0f}ms, "
+          f"avg TPOT {results['avg_tpot']*1000:.1f}ms")
+
+    return results
+
+async def make_batch_request(client: httpx.AsyncClient, prompts: List[str]) -> float:
+    """Send all prompts in one /api/generate_batch call and return latency"""
+    start = time.time()
+    response = await client.post(
+        "http://localhost:11434/api/generate_batch",
+        json=[
+            {
+                "model": "facebook/opt-125m",
+                "prompt": prompt,
+                "options": {"max_tokens": 50}
+            }
+            for prompt in prompts
+        ],
+    )
+    latency = time.time() - start
+    response.raise_for_status()
+    return latency
+
+async def benchmark_batch(client: httpx.AsyncClient, num_requests: int) -> dict:
+    """Run the same workload as one batch request"""
+    prompt = "Explain quantum computing in simple terms"
+
+    total_time = await make_batch_request(client, [prompt] * num_requests)
+
+    results = {
+        "num_requests": num_requests,
+        "total_time": total_time,
+        "throughput": num_requests / total_time,
+    }
+
+    print(f"✓ Batch of {num_requests} completed in {total_time:.2f}s")
+    print(f"  Throughput: {results['throughput']:.2f} req/s")
+
+    return results
+
+async def benchmark_concurrent(client: httpx.AsyncClient, num_requests: int) -> dict:
     """Run concurrent requests and measure performance"""
     print(f"\n{'='*60}")
     print(f"Testing {num_requests} concurrent requests...")
@@ -34,16 +124,15 @@ async def benchmark_concurrent(num_requests: int) -> dict:
 
     prompt = "Explain quantum computing in simple terms"
 
-    async with httpx.AsyncClient() as client:
-        start_time = time.time()
+    start_time = time.time()
 
-        # Create all tasks
-        tasks = [make_request(client, prompt) for _ in range(num_requests)]
+    # Create all tasks
+    tasks = [make_request(client, prompt) for _ in range(num_requests)]
 
-        # Run concurrently
-        latencies = await asyncio.gather(*tasks)
+    # Run concurrently
+    latencies = await asyncio.gather(*tasks)
 
-        total_time = time.time() - start_time
+    total_time = time.time() - start_time
 
     # Calculate stats
     avg_latency = sum(latencies) / len(latencies)
@@ -74,12 +163,30 @@ async def main():
     print("Optimizations: chunked-prefill ✓, prefix-caching ✓, 16384 batched tokens")
 
     results = []
-
-    # Test different concurrency levels
-    for n in [5, 10, 50]:
-        result = await benchmark_concurrent(n)
-        results.append(result)
-        await asyncio.sleep(2)  # Pause between tests
+    batch_results = []
+    streaming_results = []
+
+    # One pooled client for all sweeps so connections opened at 5/10 are reused at 50
+    async with httpx.AsyncClient(limits=CLIENT_LIMITS, timeout=CLIENT_TIMEOUT) as client:
+        # Keep one-shot costs (lazy init, CUDA graphs, connection setup) out of
+        # the first measurement
+        print("\nWarming up...")
+        for _ in range(3):
+            await make_request(client, "warm")
+
+        # Test different concurrency levels
+        for n in [5, 10, 50]:
+            result = await benchmark_concurrent(client, n)
+            results.append(result)
+            await asyncio.sleep(2)  # Pause between tests
+
+            # Same prompts through one /api/generate_batch call
+            batch_results.append(await benchmark_batch(client, n))
+            await asyncio.sleep(2)
+
+            # Same prompts streamed, for latency to first token
+            streaming_results.append(await benchmark_streaming(client, n))
+            await asyncio.sleep(2)
 
     # Summary
     print(f"\n{'='*60}")
@@ -90,6 +197,25 @@ async def main():
     for r in results:
         print(f"{r['num_requests']:<12} {r['total_time']:<12.2f} {r['throughput']:<15.2f}")
 
+    print(f"\n{'='*60}")
+    print("STREAMING LATENCY")
+    print(f"{'='*60}")
+    print(f"{'Concurrent':<12} {'Avg TTFT':<12} {'Max TTFT':<12} {'Avg TPOT':<12}")
+    print(f"{'-'*60}")
+    for r in streaming_results:
+        print(f"{r['num_requests']:<12} {r['avg_ttft']*1000:<12.0f} {r['max_ttft']*1000:<12.0f} {r['avg_tpot']*1000:<12.1f}")
+    print("(milliseconds)")
+
+    # Both paths hit the same vLLM batcher, so the gap is per-request HTTP overhead
+    print(f"\n{'='*60}")
+    print("CONCURRENT vs BATCH (/api/generate_batch)")
+    print(f"{'='*60}")
+    print(f"{'Requests':<12} {'Concurrent':<15} {'Batch':<15} {'Speedup':<10}")
+    print(f"{'-'*60}")
+    for r, b in zip(results, batch_results):
+        speedup = b['throughput'] / r['throughput']
+        print(f"{r['num_requests']:<12} {r['throughput']:<15.2f} {b['throughput']:<15.2f} {speedup:<10.2f}")
+
     print(f"\n{'='*60}")
     print("COMPARISON TO OLD BENCHMARK (before optimizations)")
     print(f"{'='*60}")